@@ -0,0 +1,38 @@
+from agentic_common.llm import (
+    ResilientChatOpenAI,
+    get_async_http_client,
+    get_chat_model,
+    get_http_client,
+)
+from agentic_common.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    REGISTRY,
+    MetricsCallbackHandler,
+    MetricsRegistry,
+    format_ms,
+    format_table,
+    print_summary_at_exit,
+    record_cache,
+)
+from agentic_common.replay import FixtureNotFoundError, FixtureStore, get_fixture_store
+from agentic_common.search import ReplayableTavilySearchResults, get_search_tool
+
+__all__ = [
+    "PROMETHEUS_CONTENT_TYPE",
+    "REGISTRY",
+    "FixtureNotFoundError",
+    "FixtureStore",
+    "MetricsCallbackHandler",
+    "MetricsRegistry",
+    "ReplayableTavilySearchResults",
+    "ResilientChatOpenAI",
+    "format_ms",
+    "format_table",
+    "get_async_http_client",
+    "get_chat_model",
+    "get_fixture_store",
+    "get_http_client",
+    "get_search_tool",
+    "print_summary_at_exit",
+    "record_cache",
+]
@@ -0,0 +1,198 @@
+"""Offline benchmark of the example graphs against recorded fixtures.
+
+Record fixtures once with live OpenAI and Tavily keys, then replay them as
+often as needed without network access::
+
+    python -m agentic_common.benchmark --record
+    python -m agentic_common.benchmark --iterations 50 --latency 0.2
+
+For every node it reports the average wall time, the part spent in (replayed)
+LLM and tool calls, and the remainder: LangGraph/LangChain overhead plus the
+node's own code. For every graph it also reports the time spent outside nodes
+(scheduling, state merging, checkpointing). The HIL graph has no LLM calls and
+is driven through its FastAPI handler, so its run time is per full session and
+its time outside nodes also covers the handler's own work (session bookkeeping,
+checkpoint reads and logging).
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import runpy
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from agentic_common.metrics import REGISTRY, MetricsCallbackHandler, format_ms, format_table
+from agentic_common.replay import DEFAULT_FIXTURES, get_fixture_store
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+SCRIPTS = {
+    "search": REPO_ROOT / "langgraph-agentic-web-search" / "main.py",
+    "article": REPO_ROOT / "langgraph-critique-search-refine" / "langgraph-critique-search-refine.py",
+    "chatbot": REPO_ROOT / "langgraph-conversation-history" / "session-state-conversation-history.py",
+    "hil": REPO_ROOT / "langgraph-HIL-human-in-the-loop" / "langgraph-HIL-human-in-the-loop.py",
+}
+
+CHATBOT_TURNS = [
+    "Hi! What is LangGraph?",
+    "How does a StateGraph keep track of conversation history?",
+    "Summarize our conversation in one sentence.",
+]
+
+HIL_ACTIONS = [
+    ("", "start"),
+    ("First detail", "provide_detail"),
+    ("Second detail", "provide_detail"),
+    ("Third detail", "provide_detail"),
+    ("Fourth detail", "provide_detail"),
+    ("", "modify_transform"),
+    ("", "confirm_upload"),
+]
+
+
+def _run_search(module: Dict[str, Any], handler: MetricsCallbackHandler, iteration: int) -> None:
+    module["search_workflow"].invoke({"query": module["query"]}, config={"callbacks": [handler]})
+
+
+def _run_article(module: Dict[str, Any], handler: MetricsCallbackHandler, iteration: int) -> None:
+    module["article_workflow"].invoke(module["input_message"], config={"callbacks": [handler]})
+
+
+def _run_chatbot(module: Dict[str, Any], handler: MetricsCallbackHandler, iteration: int) -> None:
+    # Compile once per benchmark, as the Streamlit app does once per session.
+    if "_benchmark_graph" not in module:
+        module["_benchmark_graph"] = module["create_chatbot_graph"]()
+    graph = module["_benchmark_graph"]
+    state = {"messages": [], "input": ""}
+    for turn in CHATBOT_TURNS:
+        state = graph.invoke({"messages": state["messages"], "input": turn}, config={"callbacks": [handler]})
+
+
+def _run_hil(module: Dict[str, Any], handler: MetricsCallbackHandler, iteration: int) -> None:
+    # handle_workflow attaches the server's own metrics handler, labelled "hil".
+    async def session() -> None:
+        for text, action in HIL_ACTIONS:
+            await module["handle_workflow"](f"benchmark-{iteration}", module["UserInput"](input=text, action=action))
+
+    asyncio.run(session())
+
+
+RUNNERS: Dict[str, Callable[[Dict[str, Any], MetricsCallbackHandler, int], None]] = {
+    "search": _run_search,
+    "article": _run_article,
+    "chatbot": _run_chatbot,
+    "hil": _run_hil,
+}
+
+
+def _load(name: str) -> Dict[str, Any]:
+    """Execute an example script without its __main__ block and return its globals."""
+    script = SCRIPTS[name]
+    cwd = os.getcwd()
+    os.chdir(script.parent)  # so load_dotenv() and files the script writes stay in its directory
+    try:
+        return runpy.run_path(str(script))
+    finally:
+        os.chdir(cwd)
+
+
+def benchmark(name: str, iterations: int, warmup: int) -> Dict[str, Any]:
+    """Run one graph and return its per-run timings and per-node rows."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        module = _load(name)
+        handler = MetricsCallbackHandler(graph=name)
+        run = RUNNERS[name]
+        for i in range(warmup):
+            run(module, handler, -1 - i)
+
+        REGISTRY.reset()
+        timings: List[float] = []
+        for i in range(iterations):
+            start = time.perf_counter()
+            run(module, handler, i)
+            timings.append(time.perf_counter() - start)
+
+    nodes = []
+    in_nodes = 0.0
+    for (graph, node), hist in sorted(REGISTRY.node_latency.items()):
+        if graph != name:
+            continue
+        external = REGISTRY.node_external.get((graph, node), 0.0)
+        in_nodes += hist.sum
+        nodes.append(
+            (
+                name,
+                node,
+                hist.count,
+                format_ms(hist.sum / hist.count),
+                format_ms(external / hist.count),
+                format_ms((hist.sum - external) / hist.count),
+            )
+        )
+    if not nodes:
+        # Otherwise the whole run would be reported as time outside nodes.
+        raise RuntimeError(f"No node runs were recorded for the {name} graph; its nodes never executed")
+    total = sum(timings)
+    timings.sort()
+    return {
+        "graph": (
+            name,
+            iterations,
+            format_ms(total / iterations),
+            format_ms(statistics.median(timings)),
+            format_ms(timings[min(len(timings) - 1, int(0.95 * len(timings)))]),
+            format_ms((total - in_nodes) / iterations),
+        ),
+        "nodes": nodes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the example graphs offline against recorded fixtures.")
+    parser.add_argument("--graphs", nargs="+", choices=list(SCRIPTS), default=list(SCRIPTS))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per graph before measuring")
+    parser.add_argument("--latency", type=float, default=0.0, help="synthetic seconds per replayed LLM/search call")
+    parser.add_argument("--fixtures", default=str(REPO_ROOT / "agentic-common" / DEFAULT_FIXTURES))
+    parser.add_argument("--record", action="store_true", help="run each graph once against the live APIs and record fixtures")
+    args = parser.parse_args()
+
+    os.environ["REPLAY_FIXTURES"] = str(Path(args.fixtures).resolve())
+    os.environ["REPLAY_LATENCY"] = str(args.latency)
+    if args.record:
+        os.environ["REPLAY_MODE"] = "record"
+        iterations, warmup = 1, 0
+    else:
+        os.environ["REPLAY_MODE"] = "replay"
+        # Clients validate that a key is configured even though replay never sends it.
+        os.environ.setdefault("OPENAI_API_KEY", "replay")
+        os.environ.setdefault("TAVILY_API_KEY", "replay")
+        iterations, warmup = args.iterations, args.warmup
+
+    # The examples log every HIL transition at INFO; keep the report readable.
+    logging.disable(logging.INFO)
+
+    graph_rows, node_rows = [], []
+    for name in args.graphs:
+        print(f"⏱️  Benchmarking {name}...")
+        result = benchmark(name, iterations, warmup)
+        graph_rows.append(result["graph"])
+        node_rows.extend(result["nodes"])
+
+    if args.record:
+        get_fixture_store().flush()
+        print(f"\nRecorded fixtures to {os.environ['REPLAY_FIXTURES']}")
+        return
+    print(f"\n📊 **Graphs** ({args.latency * 1000:.0f} ms synthetic latency per LLM/search call):")
+    print(format_table(("graph", "runs", "avg ms", "p50 ms", "p95 ms", "outside nodes ms"), graph_rows))
+    print("\n📊 **Nodes** (averages per call):")
+    print(format_table(("graph", "node", "calls", "node ms", "llm/tool ms", "overhead ms"), node_rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Minimal OpenAI-compatible chat completions server for running the examples offline.
+
+It answers ``POST /v1/chat/completions`` by echoing the last message, and can
+add latency or answer the first requests with HTTP 429 to exercise retries::
+
+    python -m agentic_common.fake_openai --port 8099 --latency 0.5 --rate-limit-first 2
+    OPENAI_BASE_URL=http://127.0.0.1:8099/v1 OPENAI_API_KEY=fake python main.py
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+class FakeOpenAIServer:
+    """Threaded fake server; use as a context manager or call ``start``/``stop``."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, rate_limit_first: int = 0):
+        self.latency = latency
+        self.rate_limit_first = rate_limit_first
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def _next_request(self) -> int:
+        with self._lock:
+            self.request_count += 1
+            return self.request_count
+
+
+def _completion(model: str, content: str, prompt_tokens: int) -> Dict[str, Any]:
+    """Build a chat.completion response body."""
+    completion_tokens = len(content.split())
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _handler_for(server: FakeOpenAIServer) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+        def do_POST(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.endswith("/chat/completions"):
+                self._send(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                return
+
+            number = server._next_request()
+            if server.latency:
+                time.sleep(server.latency)
+            if number <= server.rate_limit_first:
+                self._send(
+                    429,
+                    {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                    {"Retry-After": "0"},
+                )
+                return
+
+            messages = body.get("messages", [])
+            last = str(messages[-1].get("content", "")) if messages else ""
+            prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+            self._send(200, _completion(body.get("model", "fake"), f"echo: {last}", prompt_tokens))
+
+        def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each response")
+    parser.add_argument("--rate-limit-first", type=int, default=0, help="answer the first N requests with 429")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.host, args.port, args.latency, args.rate_limit_first)
+    print(f"Fake OpenAI server listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
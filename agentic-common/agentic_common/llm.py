@@ -0,0 +1,353 @@
+"""Shared ChatOpenAI client for the LangGraph examples.
+
+``get_chat_model`` returns a ``ChatOpenAI`` that:
+
+- reuses pooled HTTP connections: one pool per process for sync calls and
+  one per event loop for async calls,
+- caps the number of in-flight requests (``LLM_MAX_CONCURRENCY``),
+- retries rate-limit and transient errors with jittered exponential
+  backoff, honouring ``Retry-After`` (``LLM_MAX_RETRIES``),
+- coalesces concurrent identical requests into a single upstream call,
+- records to or replays from the fixture store when ``REPLAY_MODE`` is set
+  (see ``agentic_common.replay``).
+
+Point ``OPENAI_BASE_URL`` at any OpenAI-compatible server, e.g.
+``agentic_common.fake_openai``, to run against it instead of OpenAI.
+Streaming calls (``llm.stream``) go straight to ``ChatOpenAI``.
+"""
+import asyncio
+import copy
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+import httpx
+import openai
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.load import dumps
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import ChatOpenAI
+
+from agentic_common.metrics import record_cache
+from agentic_common.replay import get_fixture_store
+
+T = TypeVar("T")
+
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 5))
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 30.0  # seconds, also the longest Retry-After we honour
+
+# The same errors the openai SDK retries by default; APITimeoutError is an APIConnectionError.
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share its result."""
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result: Any = None
+            self.error: Optional[BaseException] = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, "SingleFlight._Call"] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Return ``(result, coalesced)``; followers get their own copy of the leader's result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result), True
+
+        try:
+            result = fn()
+            # Snapshot before returning: the leader's caller goes on to mutate its result.
+            call.result = copy.deepcopy(result)
+            return result, False
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of ``SingleFlight``; calls are only shared within one event loop."""
+
+    def __init__(self):
+        self._calls: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        flight_key = (id(asyncio.get_running_loop()), key)
+        task = self._calls.get(flight_key)
+        if task is not None:
+            # shield() so a cancelled follower doesn't cancel the shared call.
+            _, snapshot = await asyncio.shield(task)
+            return copy.deepcopy(snapshot), True
+
+        task = asyncio.ensure_future(self._run(fn))
+        self._calls[flight_key] = task
+        task.add_done_callback(lambda _: self._calls.pop(flight_key, None))
+        result, _ = await asyncio.shield(task)
+        return result, False
+
+    @staticmethod
+    async def _run(fn: Callable[[], Awaitable[T]]) -> Tuple[T, T]:
+        # Snapshot before the leader's caller gets to mutate the result.
+        result = await fn()
+        return result, copy.deepcopy(result)
+
+
+class LoopLocalAsyncClient(openai.DefaultAsyncHttpxClient):
+    """Async HTTP client that keeps a separate connection pool per event loop.
+
+    httpx connections belong to the loop that opened them, so a single pool
+    shared across loops (e.g. successive ``asyncio.run`` calls) fails with
+    "Event loop is closed" on the second loop. Requests are built by this client
+    and sent through the running loop's own ``openai.DefaultAsyncHttpxClient``.
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._client_kwargs = kwargs
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        client = self._loop_clients.get(loop)
+        if client is None:
+            client = self._loop_clients[loop] = openai.DefaultAsyncHttpxClient(**self._client_kwargs)
+        return await client.send(request, **kwargs)
+
+    async def aclose(self) -> None:
+        client = self._loop_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+        await super().aclose()
+
+
+_pool_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[LoopLocalAsyncClient] = None
+
+_sync_flights = SingleFlight()
+_async_flights = AsyncSingleFlight()
+_sync_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+# asyncio.Semaphore binds to the loop it is first used on, so keep one per loop.
+_async_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY)
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide keep-alive connection pool for synchronous OpenAI calls."""
+    global _http_client
+    with _pool_lock:
+        if _http_client is None:
+            _http_client = openai.DefaultHttpxClient(limits=_limits())
+        return _http_client
+
+
+def get_async_http_client() -> LoopLocalAsyncClient:
+    """Process-wide client for asynchronous OpenAI calls, with a keep-alive pool per event loop."""
+    global _async_http_client
+    with _pool_lock:
+        if _async_http_client is None:
+            _async_http_client = LoopLocalAsyncClient(limits=_limits())
+        return _async_http_client
+
+
+def _async_slot() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slot = _async_slots.get(loop)
+    if slot is None:
+        slot = _async_slots[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return slot
+
+
+def _backoff(attempt: int, error: BaseException) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            delay = max(delay, float(response.headers.get("retry-after", 0)))
+        except ValueError:
+            pass
+    return min(delay, BACKOFF_CAP)
+
+
+def call_with_retries(fn: Callable[[], T]) -> T:
+    """Call ``fn`` under the concurrency cap, retrying retryable OpenAI errors."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            with _sync_slots:
+                return fn()
+        except RETRYABLE_ERRORS as error:
+            if attempt == MAX_RETRIES:
+                raise
+            # Sleep outside the slot so a backing-off call doesn't block others.
+            time.sleep(_backoff(attempt, error))
+
+
+async def acall_with_retries(fn: Callable[[], Awaitable[T]]) -> T:
+    """Async version of ``call_with_retries``."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with _async_slot():
+                return await fn()
+        except RETRYABLE_ERRORS as error:
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(_backoff(attempt, error))
+
+
+def _mark_coalesced(result: ChatResult) -> ChatResult:
+    """Prepare a follower's copy of a shared result.
+
+    Clearing the message id lets LangChain give it the follower's own run id,
+    and the ``coalesced`` flag tells the metrics not to count its tokens again.
+    """
+    for generation in result.generations:
+        generation.message.id = None
+        generation.generation_info = {**(generation.generation_info or {}), "coalesced": True}
+    return result
+
+
+def _encode_chat_result(result: ChatResult) -> Dict[str, Any]:
+    return {
+        "generations": [
+            {"message": message_to_dict(generation.message), "generation_info": generation.generation_info}
+            for generation in result.generations
+        ],
+        "llm_output": result.llm_output,
+    }
+
+
+def _decode_chat_result(data: Dict[str, Any]) -> ChatResult:
+    return ChatResult(
+        generations=[
+            ChatGeneration(
+                message=messages_from_dict([generation["message"]])[0],
+                generation_info=generation["generation_info"],
+            )
+            for generation in data["generations"]
+        ],
+        llm_output=data["llm_output"],
+    )
+
+
+class ResilientChatOpenAI(ChatOpenAI):
+    """ChatOpenAI with bounded concurrency, jittered retries and request coalescing."""
+
+    def _flight_key(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> Tuple[str, str]:
+        # Same key LangChain's LLM cache uses: model parameters plus the serialized prompt.
+        return self._get_llm_string(stop=stop, **kwargs), dumps(messages)
+
+    def _fixture_request(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        # Message ids are generated per run, so they are left out of the fixture key.
+        serialized = []
+        for message in messages:
+            data = message_to_dict(message)
+            data["data"].pop("id", None)
+            serialized.append(data)
+        return {"params": self._get_invocation_params(stop=stop, **kwargs), "messages": serialized}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        store = get_fixture_store()
+        if store is None:
+            return self._generate_upstream(messages, stop, run_manager, **kwargs)
+        return store.call(
+            "chat",
+            self._fixture_request(messages, stop, kwargs),
+            lambda: self._generate_upstream(messages, stop, run_manager, **kwargs),
+            _encode_chat_result,
+            _decode_chat_result,
+            run_manager=run_manager,
+        )
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        store = get_fixture_store()
+        if store is None:
+            return await self._agenerate_upstream(messages, stop, run_manager, **kwargs)
+        return await store.acall(
+            "chat",
+            self._fixture_request(messages, stop, kwargs),
+            lambda: self._agenerate_upstream(messages, stop, run_manager, **kwargs),
+            _encode_chat_result,
+            _decode_chat_result,
+            run_manager=run_manager,
+        )
+
+    def _generate_upstream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        generate = super()._generate
+        result, coalesced = _sync_flights.do(
+            self._flight_key(messages, stop, kwargs),
+            lambda: call_with_retries(lambda: generate(messages, stop=stop, run_manager=run_manager, **kwargs)),
+        )
+        record_cache("llm_singleflight", coalesced, run_manager)
+        return _mark_coalesced(result) if coalesced else result
+
+    async def _agenerate_upstream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        agenerate = super()._agenerate
+        result, coalesced = await _async_flights.do(
+            self._flight_key(messages, stop, kwargs),
+            lambda: acall_with_retries(lambda: agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)),
+        )
+        record_cache("llm_singleflight", coalesced, run_manager)
+        return _mark_coalesced(result) if coalesced else result
+
+
+def get_chat_model(model: str, **kwargs: Any) -> ResilientChatOpenAI:
+    """Build a ``ResilientChatOpenAI`` that uses the shared connection pools."""
+    kwargs.setdefault("http_client", get_http_client())
+    kwargs.setdefault("http_async_client", get_async_http_client())
+    # Retries happen in call_with_retries; stacking the SDK's own on top would multiply them.
+    kwargs.setdefault("max_retries", 0)
+    return ResilientChatOpenAI(model=model, **kwargs)
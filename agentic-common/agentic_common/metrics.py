@@ -0,0 +1,439 @@
+"""Per-node latency and LLM usage metrics for the LangGraph examples.
+
+Pass a ``MetricsCallbackHandler`` in the ``callbacks`` list of a graph
+invocation config. LangGraph reports every node as a chain run tagged with
+``langgraph_node`` metadata, and the LLM and tool calls made inside a node
+inherit the same callbacks, so one handler sees the whole run.
+"""
+import atexit
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler, BaseRunManager
+from langchain_core.outputs import LLMResult
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. LLM calls dominate node time, so the upper buckets go well past 10s.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the shape Prometheus expects."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+
+class MetricsRegistry:
+    """Thread-safe store for node latencies, LLM/tool calls, tokens and cache lookups."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.node_latency: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+            # Seconds each node spent waiting on LLM and tool calls made inside it
+            self.node_external: Dict[Tuple[str, str], float] = defaultdict(float)
+            self.llm_latency: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+            # (graph, model, kind) where kind is prompt, completion or cached_prompt
+            self.llm_tokens: Dict[Tuple[str, str, str], int] = defaultdict(int)
+            self.tool_calls: Dict[Tuple[str, str], int] = defaultdict(int)
+            # (cache, result) where result is hit or miss
+            self.cache_lookups: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def observe_node(self, graph: str, node: str, seconds: float) -> None:
+        with self._lock:
+            self.node_latency[(graph, node)].observe(seconds)
+
+    def add_node_external(self, graph: str, node: str, seconds: float) -> None:
+        with self._lock:
+            self.node_external[(graph, node)] += seconds
+
+    def observe_llm(
+        self,
+        graph: str,
+        model: str,
+        seconds: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cached_prompt_tokens: int = 0,
+    ) -> None:
+        with self._lock:
+            self.llm_latency[(graph, model)].observe(seconds)
+            self.llm_tokens[(graph, model, "prompt")] += prompt_tokens
+            self.llm_tokens[(graph, model, "completion")] += completion_tokens
+            self.llm_tokens[(graph, model, "cached_prompt")] += cached_prompt_tokens
+
+    def inc_tool_call(self, graph: str, tool: str) -> None:
+        with self._lock:
+            self.tool_calls[(graph, tool)] += 1
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Count a lookup against a named cache (response cache, fixture store, ...)."""
+        with self._lock:
+            self.cache_lookups[(cache, "hit" if hit else "miss")] += 1
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            lines: List[str] = []
+            _render_histograms(
+                lines,
+                "agentic_node_latency_seconds",
+                "Wall-clock time spent in each graph node.",
+                ("graph", "node"),
+                self.node_latency,
+            )
+            _render_counters(
+                lines,
+                "agentic_node_external_seconds_total",
+                "Time each node spent waiting on LLM and tool calls.",
+                ("graph", "node"),
+                self.node_external,
+            )
+            _render_histograms(
+                lines,
+                "agentic_llm_latency_seconds",
+                "Wall-clock time of each LLM call.",
+                ("graph", "model"),
+                self.llm_latency,
+            )
+            _render_counters(
+                lines,
+                "agentic_llm_calls_total",
+                "Number of LLM calls.",
+                ("graph", "model"),
+                {key: hist.count for key, hist in self.llm_latency.items()},
+            )
+            _render_counters(
+                lines,
+                "agentic_llm_tokens_total",
+                "Tokens reported by the LLM provider; cached_prompt is the part of the prompt served from the provider's prompt cache.",
+                ("graph", "model", "type"),
+                self.llm_tokens,
+            )
+            _render_counters(
+                lines,
+                "agentic_tool_calls_total",
+                "Number of tool calls.",
+                ("graph", "tool"),
+                self.tool_calls,
+            )
+            _render_counters(
+                lines,
+                "agentic_cache_lookups_total",
+                "Cache lookups by cache name and result.",
+                ("cache", "result"),
+                self.cache_lookups,
+            )
+            return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Return a plain-text summary table of everything recorded so far."""
+        with self._lock:
+            sections = []
+            if self.node_latency:
+                rows = [
+                    (
+                        graph,
+                        node,
+                        hist.count,
+                        format_ms(hist.sum),
+                        format_ms(hist.sum / hist.count),
+                        format_ms(hist.max),
+                        format_ms(self.node_external.get((graph, node), 0.0) / hist.count),
+                    )
+                    for (graph, node), hist in sorted(self.node_latency.items())
+                ]
+                sections.append(
+                    format_table(("graph", "node", "calls", "total ms", "avg ms", "max ms", "avg llm/tool ms"), rows)
+                )
+            if self.llm_latency:
+                rows = []
+                for (graph, model), hist in sorted(self.llm_latency.items()):
+                    prompt = self.llm_tokens[(graph, model, "prompt")]
+                    cached = self.llm_tokens[(graph, model, "cached_prompt")]
+                    rows.append(
+                        (
+                            graph,
+                            model,
+                            hist.count,
+                            format_ms(hist.sum / hist.count),
+                            prompt,
+                            self.llm_tokens[(graph, model, "completion")],
+                            _percent(cached, prompt),
+                        )
+                    )
+                sections.append(
+                    format_table(
+                        ("graph", "model", "calls", "avg ms", "prompt tok", "completion tok", "prompt cache %"),
+                        rows,
+                    )
+                )
+            if self.tool_calls:
+                rows = [(graph, tool, calls) for (graph, tool), calls in sorted(self.tool_calls.items())]
+                sections.append(format_table(("graph", "tool", "calls"), rows))
+            caches = sorted({cache for cache, _ in self.cache_lookups})
+            if caches:
+                rows = []
+                for cache in caches:
+                    hits = self.cache_lookups.get((cache, "hit"), 0)
+                    misses = self.cache_lookups.get((cache, "miss"), 0)
+                    rows.append((cache, hits, misses, _percent(hits, hits + misses)))
+                sections.append(format_table(("cache", "hits", "misses", "hit %"), rows))
+            if not sections:
+                return "No metrics recorded."
+            return "\n\n".join(sections)
+
+    def print_summary(self) -> None:
+        print("\n📊 **Metrics Summary:**")
+        print(self.summary())
+
+
+# Process-wide registry shared by every handler unless one is passed explicitly.
+REGISTRY = MetricsRegistry()
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Records graph node latency, LLM/tool calls and token usage into a registry."""
+
+    def __init__(self, graph: str, registry: MetricsRegistry = REGISTRY):
+        self.graph = graph
+        self.registry = registry
+        self._nodes: Dict[UUID, Tuple[str, float]] = {}
+        # run_id -> (model, node, start) and (node, start); node is None outside a graph
+        self._llm_calls: Dict[UUID, Tuple[str, Optional[str], float]] = {}
+        self._tool_calls: Dict[UUID, Tuple[Optional[str], float]] = {}
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any],
+        inputs: Dict[str, Any],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        # Writers and other internal runs inside a node carry the same
+        # langgraph_node metadata; only the node's own run is named after it.
+        # LangGraph's own __start__ input node is skipped.
+        node = (metadata or {}).get("langgraph_node")
+        if node is not None and kwargs.get("name") == node and not node.startswith("__"):
+            self._nodes[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_node(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_node(run_id)
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._start_llm(run_id, serialized, metadata)
+
+    def on_llm_start(
+        self,
+        serialized: Dict[str, Any],
+        prompts: List[str],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._start_llm(run_id, serialized, metadata)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_llm(run_id, response)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_llm(run_id)
+
+    def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        tool = kwargs.get("name") or (serialized or {}).get("name") or "unknown"
+        self.registry.inc_tool_call(self.graph, tool)
+        self._tool_calls[run_id] = ((metadata or {}).get("langgraph_node"), time.perf_counter())
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_tool(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_tool(run_id)
+
+    def _start_llm(self, run_id: UUID, serialized: Dict[str, Any], metadata: Optional[Dict[str, Any]]) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        self._llm_calls[run_id] = (_model_name(serialized, metadata), node, time.perf_counter())
+
+    def _finish_llm(self, run_id: UUID, response: Optional[LLMResult] = None) -> None:
+        started = self._llm_calls.pop(run_id, None)
+        if started is None:
+            return
+        model, node, start = started
+        seconds = time.perf_counter() - start
+        tokens = _token_usage(response) if response is not None else (0, 0, 0)
+        self.registry.observe_llm(self.graph, model, seconds, *tokens)
+        if node is not None:
+            self.registry.add_node_external(self.graph, node, seconds)
+
+    def _finish_tool(self, run_id: UUID) -> None:
+        started = self._tool_calls.pop(run_id, None)
+        if started is None:
+            return
+        node, start = started
+        if node is not None:
+            self.registry.add_node_external(self.graph, node, time.perf_counter() - start)
+
+    def _finish_node(self, run_id: UUID) -> None:
+        started = self._nodes.pop(run_id, None)
+        if started is not None:
+            node, start = started
+            self.registry.observe_node(self.graph, node, time.perf_counter() - start)
+
+
+def record_cache(cache: str, hit: bool, run_manager: Optional[BaseRunManager] = None) -> None:
+    """Count a cache lookup in the registry of each ``MetricsCallbackHandler`` on the run.
+
+    Lookups outside a run with such a handler (``run_manager`` is None or has
+    none) go to the process-wide ``REGISTRY``.
+    """
+    registries = {
+        id(handler.registry): handler.registry
+        for handler in (run_manager.handlers if run_manager is not None else [])
+        if isinstance(handler, MetricsCallbackHandler)
+    }
+    for registry in registries.values() or [REGISTRY]:
+        registry.record_cache(cache, hit)
+
+
+def print_summary_at_exit(registry: MetricsRegistry = REGISTRY) -> None:
+    """Print the summary table when the interpreter exits."""
+    atexit.register(registry.print_summary)
+
+
+def _model_name(serialized: Optional[Dict[str, Any]], metadata: Optional[Dict[str, Any]]) -> str:
+    model = (metadata or {}).get("ls_model_name")
+    if model:
+        return model
+    kwargs = (serialized or {}).get("kwargs", {})
+    return kwargs.get("model_name") or kwargs.get("model") or "unknown"
+
+
+def _token_usage(response: LLMResult) -> Tuple[int, int, int]:
+    """Return (prompt, completion, cached prompt) tokens for an LLM result.
+
+    Generations flagged ``coalesced`` shared another call's upstream request,
+    whose tokens were already counted, so they contribute nothing.
+    """
+    prompt = completion = cached = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            if (generation.generation_info or {}).get("coalesced"):
+                found = True
+                continue
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                found = True
+                prompt += usage.get("input_tokens", 0)
+                completion += usage.get("output_tokens", 0)
+                cached += (usage.get("input_token_details") or {}).get("cache_read", 0)
+    if found:
+        return prompt, completion, cached
+
+    # Older integrations only report usage in the provider-specific llm_output.
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    details = usage.get("prompt_tokens_details") or {}
+    return (
+        usage.get("prompt_tokens", 0),
+        usage.get("completion_tokens", 0),
+        details.get("cached_tokens", 0) or 0,
+    )
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _render_histograms(
+    lines: List[str],
+    name: str,
+    help_text: str,
+    label_names: Sequence[str],
+    histograms: Dict[Tuple[str, ...], Histogram],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, hist in sorted(histograms.items()):
+        labels = _labels(label_names, key)
+        for bound, count in zip(hist.buckets, hist.bucket_counts):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+        lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+        lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+
+def _render_counters(
+    lines: List[str],
+    name: str,
+    help_text: str,
+    label_names: Sequence[str],
+    counters: Dict[Tuple[str, ...], int],
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key, value in sorted(counters.items()):
+        lines.append(f"{name}{{{_labels(label_names, key)}}} {value}")
+
+
+def format_ms(seconds: float) -> str:
+    """Format a duration in seconds as milliseconds for the summary tables."""
+    return f"{seconds * 1000:.1f}"
+
+
+def _percent(part: int, whole: int) -> str:
+    return f"{100 * part / whole:.1f}" if whole else "-"
+
+
+def format_table(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """Render rows as a left-aligned plain-text table under a dashed header."""
+    cells = [list(map(str, headers))] + [list(map(str, row)) for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in cells]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
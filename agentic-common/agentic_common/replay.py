@@ -0,0 +1,187 @@
+"""Record/replay of LLM and search calls through an on-disk fixture store.
+
+Controlled by environment variables, so the examples need no code changes:
+
+- ``REPLAY_MODE``: ``off`` (default), ``record`` (call upstream and save every
+  request/response pair) or ``replay`` (answer only from the store; a request
+  that was never recorded raises ``FixtureNotFoundError``)
+- ``REPLAY_FIXTURES``: path of the store, default ``fixtures.jsonl.gz``
+- ``REPLAY_LATENCY``: seconds to sleep per replayed call, to simulate upstream latency
+
+The store is gzip-compressed JSON lines, one ``{"kind", "key", "request",
+"response"}`` object per pair, where ``key`` is a SHA-256 of the kind and the
+request. Recorded pairs are kept in memory and the whole store is rewritten as
+one deduplicated gzip stream by ``FixtureStore.flush()``, which also runs at exit.
+"""
+import asyncio
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from langchain_core.callbacks import BaseRunManager
+
+from agentic_common.metrics import record_cache
+
+T = TypeVar("T")
+
+MODES = ("off", "record", "replay")
+DEFAULT_FIXTURES = "fixtures.jsonl.gz"
+
+
+class FixtureNotFoundError(LookupError):
+    """Raised in replay mode for a request that has no recorded response."""
+
+
+class FixtureStore:
+    """Request -> response pairs for one fixture file."""
+
+    def __init__(self, path: str, mode: str, latency: float = 0.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"FixtureStore mode must be 'record' or 'replay', got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        # key -> {"kind", "key", "request", "response"}, as written to disk.
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+        elif mode == "replay":
+            raise FileNotFoundError(f"No fixture store at {path}; record one with REPLAY_MODE=record")
+
+        if mode == "record":
+            atexit.register(self.flush)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(kind: str, request: Dict[str, Any]) -> str:
+        payload = json.dumps([kind, request], sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def lookup(self, kind: str, request: Dict[str, Any], run_manager: Optional[BaseRunManager] = None) -> Any:
+        """Return the recorded response; the lookup is counted in ``run_manager``'s metrics registries."""
+        key = self.key(kind, request)
+        with self._lock:
+            entry = self._entries.get(key)
+        found = entry is not None
+        record_cache("replay_fixtures", found, run_manager)
+        if not found:
+            raise FixtureNotFoundError(
+                f"No recorded {kind} response for request {key[:12]} in {self.path}; "
+                "re-record with REPLAY_MODE=record"
+            )
+        return entry["response"]
+
+    def record(self, kind: str, request: Dict[str, Any], response: Any) -> None:
+        """Store a pair in memory; ``flush()`` writes it to disk."""
+        key = self.key(kind, request)
+        # Round-trip through JSON so the entry holds exactly what flush() will write.
+        entry = json.loads(
+            json.dumps({"kind": kind, "key": key, "request": request, "response": response}, default=str)
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Rewrite the store file with every entry, once per key, if anything was recorded."""
+        with self._lock:
+            if not self._dirty:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            # Write beside the target and rename, so an interrupted flush keeps the old file.
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                    for entry in self._entries.values():
+                        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            self._dirty = False
+
+    def close(self) -> None:
+        """Flush and stop flushing at exit."""
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def call(
+        self,
+        kind: str,
+        request: Dict[str, Any],
+        fn: Callable[[], T],
+        encode: Callable[[T], Any],
+        decode: Callable[[Any], T],
+        recordable: Callable[[T], bool] = lambda result: True,
+        run_manager: Optional[BaseRunManager] = None,
+    ) -> T:
+        """Replay ``request`` from the store, or call ``fn`` and record its result."""
+        if self.mode == "replay":
+            response = self.lookup(kind, request, run_manager)
+            if self.latency:
+                time.sleep(self.latency)
+            return decode(response)
+        result = fn()
+        if recordable(result):
+            self.record(kind, request, encode(result))
+        return result
+
+    async def acall(
+        self,
+        kind: str,
+        request: Dict[str, Any],
+        fn: Callable[[], Awaitable[T]],
+        encode: Callable[[T], Any],
+        decode: Callable[[Any], T],
+        recordable: Callable[[T], bool] = lambda result: True,
+        run_manager: Optional[BaseRunManager] = None,
+    ) -> T:
+        """Async version of ``call``."""
+        if self.mode == "replay":
+            response = self.lookup(kind, request, run_manager)
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return decode(response)
+        result = await fn()
+        if recordable(result):
+            self.record(kind, request, encode(result))
+        return result
+
+
+_store_lock = threading.Lock()
+_store: Optional[FixtureStore] = None
+
+
+def get_fixture_store() -> Optional[FixtureStore]:
+    """Return the store selected by the REPLAY_* environment variables, or None when off."""
+    global _store
+    mode = os.getenv("REPLAY_MODE", "off")
+    if mode not in MODES:
+        raise ValueError(f"REPLAY_MODE must be one of {', '.join(MODES)}, got {mode!r}")
+    if mode == "off":
+        return None
+    path = os.getenv("REPLAY_FIXTURES", DEFAULT_FIXTURES)
+    latency = float(os.getenv("REPLAY_LATENCY", 0))
+    with _store_lock:
+        if _store is None or (_store.path, _store.mode) != (path, mode):
+            if _store is not None:
+                _store.close()
+            _store = FixtureStore(path, mode, latency)
+        _store.latency = latency
+        return _store
@@ -0,0 +1,55 @@
+"""Tavily search tool shared by the examples, with record/replay support."""
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from langchain_community.tools import TavilySearchResults
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+
+from agentic_common.replay import get_fixture_store
+
+SearchResult = Tuple[Union[List[Dict[str, str]], str], Dict]
+
+
+def _recordable(result: SearchResult) -> bool:
+    # TavilySearchResults reports API errors as (repr(error), {}); don't save those.
+    content, _ = result
+    return not isinstance(content, str)
+
+
+def _decode(data: List[Any]) -> SearchResult:
+    content, artifact = data
+    return content, artifact
+
+
+class ReplayableTavilySearchResults(TavilySearchResults):
+    """TavilySearchResults that records to / replays from the fixture store when REPLAY_MODE is set."""
+
+    def _fixture_request(self, query: str) -> Dict[str, Any]:
+        return {
+            "query": query,
+            "max_results": self.max_results,
+            "search_depth": self.search_depth,
+            "include_domains": self.include_domains,
+            "exclude_domains": self.exclude_domains,
+            "include_answer": self.include_answer,
+            "include_raw_content": self.include_raw_content,
+            "include_images": self.include_images,
+        }
+
+    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> SearchResult:
+        store = get_fixture_store()
+        run = super()._run
+        if store is None:
+            return run(query, run_manager)
+        return store.call("search", self._fixture_request(query), lambda: run(query, run_manager), list, _decode, _recordable, run_manager)
+
+    async def _arun(self, query: str, run_manager: Optional[AsyncCallbackManagerForToolRun] = None) -> SearchResult:
+        store = get_fixture_store()
+        arun = super()._arun
+        if store is None:
+            return await arun(query, run_manager)
+        return await store.acall("search", self._fixture_request(query), lambda: arun(query, run_manager), list, _decode, _recordable, run_manager)
+
+
+def get_search_tool(**kwargs: Any) -> ReplayableTavilySearchResults:
+    """Build the Tavily search tool used by the examples."""
+    return ReplayableTavilySearchResults(**kwargs)
@@ -0,0 +1,124 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import openai
+import pytest
+
+from agentic_common import llm
+from agentic_common.fake_openai import FakeOpenAIServer
+from agentic_common.llm import get_chat_model
+from agentic_common.metrics import MetricsCallbackHandler, MetricsRegistry
+
+CALLERS = 5
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(llm, "BACKOFF_BASE", 0.01)
+
+
+def _model(server):
+    return get_chat_model("gpt-4o", temperature=0, api_key="fake", base_url=server.base_url)
+
+
+def test_concurrent_identical_prompts_make_one_request():
+    with FakeOpenAIServer(latency=0.3) as server:
+        model = _model(server)
+        with ThreadPoolExecutor(CALLERS) as pool:
+            replies = list(pool.map(lambda _: model.invoke("hello world"), range(CALLERS)))
+
+    assert server.request_count == 1
+    assert [reply.content for reply in replies] == ["echo: hello world"] * CALLERS
+
+
+def test_concurrent_identical_prompts_make_one_request_async():
+    with FakeOpenAIServer(latency=0.3) as server:
+        model = _model(server)
+
+        async def ask():
+            return await asyncio.gather(*[model.ainvoke("hello world") for _ in range(CALLERS)], model.ainvoke("other"))
+
+        replies = asyncio.run(ask())
+
+    assert server.request_count == 2
+    assert [reply.content for reply in replies] == ["echo: hello world"] * CALLERS + ["echo: other"]
+
+
+def test_async_calls_work_across_event_loops(monkeypatch):
+    # Without retries to mask it, a pool shared across loops fails on the second asyncio.run.
+    monkeypatch.setattr(llm, "MAX_RETRIES", 0)
+    with FakeOpenAIServer() as server:
+        model = _model(server)
+        replies = [asyncio.run(model.ainvoke(f"loop {i}")) for i in range(2)]
+
+    assert server.request_count == 2
+    assert [reply.content for reply in replies] == ["echo: loop 0", "echo: loop 1"]
+
+
+def test_coalesced_callers_get_distinct_message_ids():
+    with FakeOpenAIServer(latency=0.3) as server:
+        model = _model(server)
+        with ThreadPoolExecutor(CALLERS) as pool:
+            replies = list(pool.map(lambda _: model.invoke("hello world"), range(CALLERS)))
+
+        async def ask():
+            return await asyncio.gather(*[model.ainvoke("hello async") for _ in range(CALLERS)])
+
+        async_replies = asyncio.run(ask())
+
+    for batch in (replies, async_replies):
+        ids = [reply.id for reply in batch]
+        assert None not in ids
+        assert len(set(ids)) == CALLERS
+
+
+def test_coalesced_callers_do_not_count_tokens_twice():
+    registry = MetricsRegistry()
+    handler = MetricsCallbackHandler(graph="test", registry=registry)
+    with FakeOpenAIServer(latency=0.3) as server:
+        model = _model(server)
+        with ThreadPoolExecutor(CALLERS) as pool:
+            list(pool.map(lambda _: model.invoke("hello world", config={"callbacks": [handler]}), range(CALLERS)))
+
+    assert server.request_count == 1
+    assert registry.llm_latency[("test", "gpt-4o")].count == CALLERS
+    # One upstream call: "hello world" in, "echo: hello world" out.
+    assert registry.llm_tokens[("test", "gpt-4o", "prompt")] == 2
+    assert registry.llm_tokens[("test", "gpt-4o", "completion")] == 3
+    # Cache lookups land in the handler's registry, not just the global one.
+    assert registry.cache_lookups[("llm_singleflight", "miss")] == 1
+    assert registry.cache_lookups[("llm_singleflight", "hit")] == CALLERS - 1
+
+
+def test_rate_limited_request_succeeds_on_third_attempt():
+    with FakeOpenAIServer(rate_limit_first=2) as server:
+        reply = _model(server).invoke("retry me")
+
+    assert server.request_count == 3
+    assert reply.content == "echo: retry me"
+
+
+def test_leader_error_reaches_followers(monkeypatch):
+    monkeypatch.setattr(llm, "MAX_RETRIES", 0)
+    with FakeOpenAIServer(latency=0.3, rate_limit_first=100) as server:
+        model = _model(server)
+
+        def ask(_):
+            try:
+                model.invoke("hello world")
+            except openai.RateLimitError as error:
+                return error
+
+        with ThreadPoolExecutor(CALLERS) as pool:
+            errors = list(pool.map(ask, range(CALLERS)))
+
+    assert server.request_count == 1
+    assert all(isinstance(error, openai.RateLimitError) for error in errors)
+
+
+def test_retry_after_is_capped():
+    request = httpx.Request("POST", "http://fake/v1/chat/completions")
+    response = httpx.Response(429, headers={"Retry-After": "3600"}, request=request)
+    error = openai.RateLimitError("slow down", response=response, body=None)
+    assert llm._backoff(0, error) == llm.BACKOFF_CAP
@@ -0,0 +1,105 @@
+import runpy
+import time
+from typing import TypedDict
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+
+from agentic_common.benchmark import SCRIPTS
+from agentic_common.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, MetricsCallbackHandler, MetricsRegistry
+
+TOOL_SECONDS = 0.05
+
+
+class State(TypedDict):
+    text: str
+
+
+@tool
+def slow_lookup(query: str) -> str:
+    """Pretend to look something up."""
+    time.sleep(TOOL_SECONDS)
+    return query.upper()
+
+
+def _two_node_graph():
+    StateGraph = pytest.importorskip("langgraph.graph").StateGraph
+    model = FakeListChatModel(responses=["summary"])
+
+    def search(state: State) -> State:
+        # A nested runnable carries the node's langgraph_node metadata but must not count as the node.
+        text = RunnableLambda(lambda text: text.strip(), name="strip").invoke(state["text"])
+        return {"text": slow_lookup.invoke(text)}
+
+    def summarize(state: State) -> State:
+        return {"text": model.invoke(state["text"]).content}
+
+    graph = StateGraph(State)
+    graph.add_node("search", search)
+    graph.add_node("summarize", summarize)
+    graph.set_entry_point("search")
+    graph.add_edge("search", "summarize")
+    graph.set_finish_point("summarize")
+    return graph.compile()
+
+
+def test_node_latency_and_external_time():
+    registry = MetricsRegistry()
+    handler = MetricsCallbackHandler(graph="test", registry=registry)
+
+    result = _two_node_graph().invoke({"text": " langgraph "}, config={"callbacks": [handler]})
+
+    assert result == {"text": "summary"}
+    # __start__, writers and the nested "strip" run are not nodes.
+    assert set(registry.node_latency) == {("test", "search"), ("test", "summarize")}
+    assert all(hist.count == 1 for hist in registry.node_latency.values())
+
+    search = registry.node_latency[("test", "search")]
+    assert TOOL_SECONDS <= registry.node_external[("test", "search")] <= search.sum
+    assert registry.tool_calls == {("test", "slow_lookup"): 1}
+    # The fake model reports no model name.
+    assert registry.llm_latency[("test", "unknown")].count == 1
+    summarize_external = registry.node_external[("test", "summarize")]
+    assert 0 < summarize_external <= registry.node_latency[("test", "summarize")].sum
+
+
+def test_render_prometheus():
+    registry = MetricsRegistry()
+    registry.observe_node("test", 'say "hi"\\\n', 0.02)
+    registry.record_cache("replay_fixtures", hit=True)
+
+    lines = registry.render_prometheus().splitlines()
+
+    labels = 'graph="test",node="say \\"hi\\"\\\\\\n"'
+    assert "# TYPE agentic_node_latency_seconds histogram" in lines
+    assert f'agentic_node_latency_seconds_bucket{{{labels},le="0.01"}} 0' in lines
+    assert f'agentic_node_latency_seconds_bucket{{{labels},le="0.025"}} 1' in lines
+    assert f'agentic_node_latency_seconds_bucket{{{labels},le="60.0"}} 1' in lines
+    assert f'agentic_node_latency_seconds_bucket{{{labels},le="+Inf"}} 1' in lines
+    assert f"agentic_node_latency_seconds_sum{{{labels}}} 0.02" in lines
+    assert f"agentic_node_latency_seconds_count{{{labels}}} 1" in lines
+    assert "# TYPE agentic_cache_lookups_total counter" in lines
+    assert 'agentic_cache_lookups_total{cache="replay_fixtures",result="hit"} 1' in lines
+
+
+def test_hil_metrics_endpoint(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("pygraphviz")
+    from fastapi.testclient import TestClient
+
+    monkeypatch.chdir(tmp_path)  # the script draws workflow.png into the working directory
+    module = runpy.run_path(str(SCRIPTS["hil"]))
+    client = TestClient(module["app"])
+    REGISTRY.reset()
+
+    client.post("/workflow/test", json={"input": "", "action": "start"})
+    for detail in ("one", "two", "three", "four"):
+        client.post("/workflow/test", json={"input": detail, "action": "provide_detail"})
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == PROMETHEUS_CONTENT_TYPE
+    assert 'agentic_node_latency_seconds_count{graph="hil",node="collecting_details"} 4' in response.text
+    assert 'agentic_node_latency_seconds_count{graph="hil",node="transforming"} 1' in response.text
@@ -0,0 +1,179 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from langchain_community.utilities.tavily_search import TavilySearchAPIWrapper
+
+from agentic_common import replay
+from agentic_common.fake_openai import FakeOpenAIServer
+from agentic_common.llm import get_chat_model
+from agentic_common.metrics import MetricsCallbackHandler, MetricsRegistry
+from agentic_common.replay import FixtureNotFoundError, get_fixture_store
+from agentic_common.search import _recordable, get_search_tool
+
+RAW_RESULTS = {
+    "query": "langgraph",
+    "results": [{"title": "LangGraph", "url": "https://example.com/langgraph", "content": "Graphs for agents.", "score": 0.9}],
+}
+
+
+@pytest.fixture
+def fixtures(tmp_path, monkeypatch):
+    """Point the fixture store at a temporary file and return a function that switches mode."""
+    path = tmp_path / "fixtures.jsonl.gz"
+    monkeypatch.setattr(replay, "_store", None)
+    monkeypatch.setenv("REPLAY_FIXTURES", str(path))
+    monkeypatch.delenv("REPLAY_LATENCY", raising=False)
+
+    def use(mode):
+        monkeypatch.setenv("REPLAY_MODE", mode)
+        return get_fixture_store()
+
+    yield path, use
+    if replay._store is not None:
+        replay._store.close()
+
+
+@pytest.fixture
+def tavily(monkeypatch):
+    """Answer Tavily searches locally and return the list of queries sent."""
+    monkeypatch.setenv("TAVILY_API_KEY", "fake")
+    queries = []
+
+    def raw_results(self, query, *args, **kwargs):
+        queries.append(query)
+        return RAW_RESULTS
+
+    monkeypatch.setattr(TavilySearchAPIWrapper, "raw_results", raw_results)
+    return queries
+
+
+def _model(server):
+    return get_chat_model("gpt-4o", temperature=0, api_key="fake", base_url=server.base_url)
+
+
+def _gzip_members(path):
+    data, members = path.read_bytes(), 0
+    while data:
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        decompressor.decompress(data)
+        data = decompressor.unused_data
+        members += 1
+    return members
+
+
+def test_chat_round_trip(fixtures):
+    path, use = fixtures
+    with FakeOpenAIServer() as server:
+        use("record")
+        recorded = _model(server).invoke("hello world")
+        get_fixture_store().flush()
+        base_url = server.base_url
+
+    use("replay")
+    # The server is gone, so this can only be answered from the store.
+    replayed = get_chat_model("gpt-4o", temperature=0, api_key="fake", base_url=base_url).invoke("hello world")
+
+    assert server.request_count == 1
+    assert replayed.content == recorded.content == "echo: hello world"
+    assert replayed.usage_metadata == recorded.usage_metadata
+
+
+def test_async_chat_round_trip(fixtures):
+    path, use = fixtures
+    with FakeOpenAIServer() as server:
+        use("record")
+        recorded = asyncio.run(_model(server).ainvoke("hello world"))
+        get_fixture_store().flush()
+        use("replay")
+        replayed = asyncio.run(_model(server).ainvoke("hello world"))
+
+    assert server.request_count == 1
+    assert replayed.content == recorded.content
+
+
+def test_search_round_trip(fixtures, tavily):
+    path, use = fixtures
+    use("record")
+    recorded = get_search_tool(max_results=1).invoke("langgraph")
+    get_fixture_store().flush()
+
+    use("replay")
+    replayed = get_search_tool(max_results=1).invoke("langgraph")
+
+    assert tavily == ["langgraph"]
+    assert replayed == recorded == RAW_RESULTS["results"]
+
+
+def test_lookups_are_counted_in_the_handler_registry(fixtures, tavily):
+    path, use = fixtures
+    use("record")
+    get_search_tool(max_results=1).invoke("langgraph")
+    get_fixture_store().flush()
+
+    use("replay")
+    registry = MetricsRegistry()
+    config = {"callbacks": [MetricsCallbackHandler(graph="test", registry=registry)]}
+    get_search_tool(max_results=1).invoke("langgraph", config=config)
+    with pytest.raises(FixtureNotFoundError):
+        get_search_tool(max_results=1).invoke("something else", config=config)
+
+    assert registry.cache_lookups == {("replay_fixtures", "hit"): 1, ("replay_fixtures", "miss"): 1}
+
+
+def test_unrecorded_request_raises(fixtures, tavily):
+    path, use = fixtures
+    use("record")
+    get_search_tool(max_results=1).invoke("langgraph")
+    get_fixture_store().flush()
+
+    use("replay")
+    with pytest.raises(FixtureNotFoundError):
+        get_search_tool(max_results=1).invoke("something else")
+    with pytest.raises(FixtureNotFoundError):
+        get_search_tool(max_results=3).invoke("langgraph")
+    assert tavily == ["langgraph"]
+
+
+def test_replay_without_store_raises(fixtures):
+    path, use = fixtures
+    with pytest.raises(FileNotFoundError):
+        use("replay")
+
+
+def test_search_errors_are_not_recorded(fixtures, monkeypatch):
+    path, use = fixtures
+    assert not _recordable(("ValueError('boom')", {}))
+    assert _recordable((RAW_RESULTS["results"], RAW_RESULTS))
+
+    monkeypatch.setenv("TAVILY_API_KEY", "fake")
+
+    def fail(self, *args, **kwargs):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(TavilySearchAPIWrapper, "raw_results", fail)
+    store = use("record")
+    assert get_search_tool(max_results=1).invoke("langgraph") == "ValueError('boom')"
+    assert len(store) == 0
+
+
+def test_rerecording_rewrites_one_compact_stream(fixtures, tavily):
+    path, use = fixtures
+    store = use("record")
+    for _ in range(3):
+        get_search_tool(max_results=1).invoke("langgraph")
+        store.flush()
+    get_search_tool(max_results=1).invoke("langchain")
+    store.close()
+
+    # A second recording session over the same file keeps one line per request.
+    replay._store = None
+    store = use("record")
+    get_search_tool(max_results=1).invoke("langgraph")
+    store.close()
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    assert len(lines) == 2
+    assert _gzip_members(path) == 1
@@ -1,6 +1,7 @@
 from typing import TypedDict, List, Optional, Dict, Any, Union
 from langgraph.graph import StateGraph, END
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 import uvicorn
 import json
@@ -10,6 +11,7 @@ import logging
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.store.memory import InMemoryStore
 from pprint import pformat, pprint
+from agentic_common import PROMETHEUS_CONTENT_TYPE, REGISTRY, MetricsCallbackHandler
 
 # Load environment variables from .env file
 load_dotenv()
@@ -25,6 +27,9 @@ app = FastAPI()
 memory_saver = MemorySaver()
 store = InMemoryStore()
 
+# Per-node latency metrics, exposed on /metrics
+metrics_handler = MetricsCallbackHandler(graph="hil")
+
 # Define Request/Response models
 class UserInput(BaseModel):
     input: str
@@ -57,10 +62,10 @@ def collecting_details(state: WorkflowState) -> Dict[str, Any]:
     
     if state["current_detail_index"] >= required_details:
         transformed_data = [f"the transformed data is {detail}" for detail in state["details"]]
-        state["transformed_data"] = transformed_data
         logger.info("Exiting collecting_details node")
         return {
             "next": "transforming",
+            "transformed_data": transformed_data,
             "workflow_state": "transforming",
             "workflow_message": "All details collected. Moving to transformation."
         }
@@ -124,6 +129,10 @@ def uploading(state: WorkflowState) -> Dict[str, Any]:
         "workflow_message": "Ready to upload. Confirm?"
     }
 
+def next_node(state: WorkflowState) -> str:
+    """Route to the node each node names in workflow_state, or finish once complete"""
+    return END if state["workflow_state"] == "complete" else state["workflow_state"]
+
 # Create and configure the graph
 def create_workflow() -> StateGraph:
     workflow = StateGraph(WorkflowState)
@@ -132,11 +141,11 @@ def create_workflow() -> StateGraph:
     workflow.add_node("awaiting_approval", awaiting_approval)
     workflow.add_node("uploading", uploading)
     
-    # Add edges
-    workflow.add_edge("collecting_details", "transforming")
-    workflow.add_edge("transforming", "awaiting_approval")
-    workflow.add_edge("awaiting_approval", "uploading")
-    workflow.add_edge("uploading", END)
+    # Add edges: each node either moves on or loops back to wait for more input
+    workflow.add_conditional_edges("collecting_details", next_node, ["collecting_details", "transforming"])
+    workflow.add_conditional_edges("transforming", next_node, ["awaiting_approval", "uploading"])
+    workflow.add_conditional_edges("awaiting_approval", next_node, ["awaiting_approval", "uploading"])
+    workflow.add_conditional_edges("uploading", next_node, ["uploading", END])
     
     workflow.set_entry_point("collecting_details")
     compiledStateGraph = workflow.compile(
@@ -181,33 +190,40 @@ def get_required_action(state: WorkflowState) -> str:
 @app.post("/workflow/{session_id}")
 async def handle_workflow(session_id: str, user_input: UserInput) -> WorkflowResponse:
     try:
+        thread = {"configurable": {"thread_id": session_id}}
+        config = {**thread, "callbacks": [metrics_handler]}
+
         if session_id not in active_sessions or user_input.action == "start":
             active_sessions[session_id] = get_initial_state()
-        
-        state = active_sessions[session_id]
-        
-        # Handle user input based on workflow state
-        if user_input.action == "provide_detail" and state["workflow_state"] == "collecting_details":
-            state["details"].append(user_input.input)
-            state["current_detail_index"] += 1
-        
-        elif user_input.action == "modify_transform" and state["workflow_state"] == "awaiting_approval":
-            if user_input.input:
-                state["transformed_data"] = [user_input.input]
-            state["is_transform_approved"] = True
-        
-        elif user_input.action == "confirm_upload" and state["workflow_state"] == "uploading":
-            state["is_uploaded"] = True
-        
-        # Process workflow
-        result = graph.invoke(state, config={"configurable": {"thread_id": session_id}})
+            state = active_sessions[session_id]
+            # Runs up to the interrupt before collecting_details, which waits for the first detail
+            result = graph.invoke(state, config=config)
+        else:
+            state = active_sessions[session_id]
+
+            # Handle user input based on workflow state
+            if user_input.action == "provide_detail" and state["workflow_state"] == "collecting_details":
+                state["details"].append(user_input.input)
+                state["current_detail_index"] += 1
+
+            elif user_input.action == "modify_transform" and state["workflow_state"] == "awaiting_approval":
+                if user_input.input:
+                    state["transformed_data"] = [user_input.input]
+                state["is_transform_approved"] = True
+
+            elif user_input.action == "confirm_upload" and state["workflow_state"] == "uploading":
+                state["is_uploaded"] = True
+
+            # Hand the input to the paused graph and resume it until it needs input again
+            graph.update_state(thread, state)
+            result = graph.invoke(None, config=config)
+
         state.update(result)
         active_sessions[session_id] = state
 
         # Log the state transition
         logger.info(f"Session {session_id}: Transitioned to {state['workflow_state']} state.")
-        config = {"configurable": {"thread_id": session_id}}
-        the_state= graph.get_state(config)
+        the_state= graph.get_state(thread)
         logger.info(pformat(f"Session {session_id}: {the_state}"))
         
         return WorkflowResponse(
@@ -230,6 +246,11 @@ async def health_check():
 async def get_sessions():
     return {"active_sessions": list(active_sessions.keys())}
 
+# Prometheus scrape endpoint
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(REGISTRY.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     logger.info("Starting LangGraph Interactive Server...")
     port = int(os.getenv("PORT", 8080))
@@ -1,13 +1,15 @@
 import os
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph
-from langchain_openai import ChatOpenAI
-from langchain_community.tools import TavilySearchResults
 from typing import TypedDict, Dict
+from agentic_common import MetricsCallbackHandler, get_chat_model, get_search_tool, print_summary_at_exit
 
 # Load API keys from .env
 load_dotenv()
 
+# Record per-node latency and LLM/tool usage
+metrics_handler = MetricsCallbackHandler(graph="search")
+
 
 # Define structured state class
 class SearchState(TypedDict):
@@ -17,7 +19,7 @@ class SearchState(TypedDict):
 
 
 # Initialize Tavily search tool
-tavily_tool = TavilySearchResults()
+tavily_tool = get_search_tool()
 
 
 def search_with_tavily(state: SearchState) -> Dict[str, str]:
@@ -29,7 +31,7 @@ def search_with_tavily(state: SearchState) -> Dict[str, str]:
 
 
 # Initialize ChatGPT-4o as the LLM
-llm = ChatOpenAI(model="gpt-4o", temperature=0)
+llm = get_chat_model("gpt-4o", temperature=0)
 
 
 def summarize_results(state: SearchState) -> Dict[str, str]:
@@ -60,9 +62,14 @@ search_workflow = workflow.compile()
 
 # Example search query
 query = "How has LangGraph changed its state update model, and what are the implications?"
-# Run the workflow
-final_result = search_workflow.invoke({"query": query})
 
-# Display the final summary
-print("\n🔹 **Final Summary:**")
-print(final_result["summary"])
+if __name__ == "__main__":
+    # Print the metrics summary table at exit
+    print_summary_at_exit()
+
+    # Run the workflow
+    final_result = search_workflow.invoke({"query": query}, config={"callbacks": [metrics_handler]})
+
+    # Display the final summary
+    print("\n🔹 **Final Summary:**")
+    print(final_result["summary"])
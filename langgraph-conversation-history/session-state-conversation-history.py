@@ -1,10 +1,10 @@
 import streamlit as st
-from langchain_community.chat_models import ChatOpenAI  # Updated import
 from langchain.prompts import PromptTemplate
 from langgraph.graph import StateGraph
 from dotenv import load_dotenv
 import os
 from typing import List, Dict, TypedDict, Tuple
+from agentic_common import REGISTRY, MetricsCallbackHandler, get_chat_model
 
 # Load environment variables
 load_dotenv()
@@ -24,12 +24,15 @@ class State(TypedDict):
     input: str
 
 # Initialize LLM
-llm = ChatOpenAI(
+llm = get_chat_model(
+    "gpt-3.5-turbo",
     temperature=0,
-    model_name="gpt-3.5-turbo",
-    openai_api_key=openai_api_key
+    api_key=openai_api_key
 )
 
+# Record per-node latency and LLM usage for every turn
+metrics_handler = MetricsCallbackHandler(graph="chatbot")
+
 # Define the prompt template
 prompt_template = PromptTemplate(
     input_variables=["input", "messages"],
@@ -54,7 +57,7 @@ def generate_response(state: State) -> State:
         input=state["input"],
         messages=messages_str
     )
-    response = llm.predict(prompt)
+    response = llm.invoke(prompt).content
 
     # Update state with new messages
     new_messages = state["messages"] + [
@@ -65,12 +68,8 @@ def generate_response(state: State) -> State:
     # Return the updated state with the messages key
     return {"messages": new_messages, "input": ""}
 
-# Initialize session state
-if "conversation_state" not in st.session_state:
-    st.session_state.conversation_state = {"messages": [], "input": ""}
-
-# Initialize StateGraph
-if "state_graph" not in st.session_state:
+def create_chatbot_graph():
+    """Build and compile the chatbot StateGraph."""
     # Use TypedDict for state_schema
     workflow = StateGraph(state_schema=State)
 
@@ -79,7 +78,7 @@ if "state_graph" not in st.session_state:
     workflow.set_entry_point("generate_response")
 
     # Compile the graph
-    st.session_state.state_graph = workflow.compile()
+    return workflow.compile()
 
 def process_user_input():
     """Process user input through the StateGraph."""
@@ -91,24 +90,42 @@ def process_user_input():
         }
 
         with st.spinner("Thinking..."):
-            result = st.session_state.state_graph.invoke(current_state)
+            result = st.session_state.state_graph.invoke(
+                current_state, config={"callbacks": [metrics_handler]}
+            )
             st.session_state.conversation_state = result
 
         # Clear input after processing
         st.session_state.user_input = ""
 
-# Streamlit UI
-st.title("LangChain Chatbot with StateGraph")
+def main():
+    # Initialize session state
+    if "conversation_state" not in st.session_state:
+        st.session_state.conversation_state = {"messages": [], "input": ""}
+
+    # Initialize StateGraph
+    if "state_graph" not in st.session_state:
+        st.session_state.state_graph = create_chatbot_graph()
+
+    # Streamlit UI
+    st.title("LangChain Chatbot with StateGraph")
+
+    # Display conversation history
+    for message in st.session_state.conversation_state["messages"]:
+        role_prefix = "You:" if message["role"] == "user" else "Assistant:"
+        st.write(f"**{role_prefix}** {message['content']}")
+
+    # User input
+    st.text_input("Enter your message:", key="user_input", on_change=process_user_input)
 
-# Display conversation history
-for message in st.session_state.conversation_state["messages"]:
-    role_prefix = "You:" if message["role"] == "user" else "Assistant:"
-    st.write(f"**{role_prefix}** {message['content']}")
+    # Metrics summary for this server process
+    with st.sidebar.expander("Metrics"):
+        st.text(REGISTRY.summary())
 
-# User input
-user_input = st.text_input("Enter your message:", key="user_input", on_change=process_user_input)
+    # Button to start a new conversation
+    if st.button("Start New Conversation"):
+        st.session_state.conversation_state = {"messages": [], "input": ""}
+        st.rerun()
 
-# Button to start a new conversation
-if st.button("Start New Conversation"):
-    st.session_state.conversation_state = {"messages": [], "input": ""}
-    st.rerun()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
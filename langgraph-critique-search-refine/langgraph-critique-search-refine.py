@@ -1,13 +1,15 @@
 import os
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph
-from langchain_openai import ChatOpenAI
-from langchain_community.tools import TavilySearchResults
 from typing import TypedDict, Dict, List
+from agentic_common import MetricsCallbackHandler, get_chat_model, get_search_tool, print_summary_at_exit
 
 # Load environment variables
 load_dotenv()
 
+# Record per-node latency and LLM/tool usage
+metrics_handler = MetricsCallbackHandler(graph="article")
+
 
 # Define structured state
 class ArticleState(TypedDict):
@@ -22,10 +24,10 @@ class ArticleState(TypedDict):
 
 
 # Initialize Tavily tool
-tavily_tool = TavilySearchResults()
+tavily_tool = get_search_tool()
 
 # Initialize GPT-4o as the LLM
-llm = ChatOpenAI(model="gpt-4o", temperature=0)
+llm = get_chat_model("gpt-4o", temperature=0)
 
 
 # 1. Generate an Initial Draft
@@ -196,10 +198,14 @@ input_message = {
     "content_details": "The article should cover state management in LangGraph, the role of Tavily in web search, how GPT-4o enhances summarization, and a step-by-step implementation guide."
 }
 
-# Run the Workflow
-final_result = article_workflow.invoke(input_message)
+if __name__ == "__main__":
+    # Print the metrics summary table at exit
+    print_summary_at_exit()
+
+    # Run the Workflow
+    final_result = article_workflow.invoke(input_message, config={"callbacks": [metrics_handler]})
 
-# Display the Final Refined Article
-print("\n🔹 **Final Article:**")
-print(final_result["revised"])
-# print(article_workflow.get_graph().draw_mermaid())
+    # Display the Final Refined Article
+    print("\n🔹 **Final Article:**")
+    print(final_result["revised"])
+    # print(article_workflow.get_graph().draw_mermaid())